@@ -1,40 +1,60 @@
 #!/usr/bin/env python3
 import argparse
-import json
-import re
+import csv
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import pandas as pd
+import ijson
 
-VALID_CHOICES = {"A", "B", "C", "D"}
+VALID_CHOICES = frozenset("ABCD")
+CSV_BUFFER_SIZE = 1 << 20  # 1 MiB: coalesce CSV rows into few write(2) calls
+PARSE_CHUNKSIZE = 32  # files per worker task
 
-def load_json_fix_keys(path: Path) -> Dict:
+def _fix_key(k: Any) -> str:
+    """Strip whitespace and any trailing colons from a key ('correct_answer:' -> 'correct_answer')."""
+    return str(k).strip().rstrip(":").rstrip()
+
+def _get_fixed(qa: Dict, key: str) -> Any:
     """
-    Load JSON and normalize a few common key quirks:
-      - strip trailing ':' in keys (e.g., 'content:' -> 'content')
+    Look up `key` in a raw question dict, falling back to quirky variants
+    (e.g., 'correct_answer:') so only the keys actually read get normalized.
     """
-    with path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    fixed = {}
-    for k, v in data.items():
-        k2 = re.sub(r":+$", "", k.strip())  # remove any trailing colons
-        fixed[k2] = v
-    return fixed
-
-def iter_qas_from_json(j: Dict) -> Iterable[Tuple[str, Dict]]:
+    if key in qa:
+        return qa[key]
+    for k, v in qa.items():
+        if _fix_key(k) == key:
+            return v
+    return None
+
+def _fix_top_prefix(prefix: str) -> str:
+    """Normalize the top-level key of an ijson prefix ('questions:.item' -> 'questions.item')."""
+    head, dot, rest = prefix.partition(".")
+    return _fix_key(head) + dot + rest
+
+def iter_questions_stream(path: Path) -> Iterator[Dict]:
     """
-    Yield (question_text, qa_dict) for each question entry.
-    Expects a 'questions' list with dicts that include:
-      - 'question'
-      - 'choices' (dict with A/B/C/D)
-      - 'correct_answer' (training/solution only)
+    Stream question dicts out of a JSON file one at a time, without
+    materializing the whole document. Tolerates a 'questions:' top-level key.
     """
-    questions = j.get("questions", []) or []
-    for qa in questions:
-        # normalize nested keys (rare colon-edge)
-        qa_fixed = {re.sub(r":+$", "", str(k)).strip(): v for k, v in qa.items()}
-        yield str(qa_fixed.get("question", "")).strip(), qa_fixed
+    with path.open("rb") as f:
+        found = False
+        for qa in ijson.items(f, "questions.item", use_float=True):
+            found = True
+            yield qa
+        if found:
+            return
+        # Rare quirk (e.g. 'questions:'): second pass with normalized top-level
+        # keys. Kept off the fast path since it routes every event through Python.
+        f.seek(0)
+        events = (
+            (_fix_top_prefix(prefix), event, value)
+            for prefix, event, value in ijson.parse(f, use_float=True)
+        )
+        yield from ijson.items(events, "questions.item")
 
 def make_row_id(stem: str, q_index: int) -> str:
     """
@@ -43,38 +63,58 @@ def make_row_id(stem: str, q_index: int) -> str:
     """
     return f"{stem}__q{q_index}"
 
-def extract_rows_from_dir(data_dir: Path, usage_value: str) -> List[Dict]:
+def _rows_from_file(path: Path) -> Tuple[List[str], List[str]]:
     """
-    Walk a directory of JSON files and extract rows:
+    Extract (row_ids, answers) columns from a single JSON file. Module-level
+    so it can be dispatched to worker processes by extract_rows_from_dir.
+    """
+    row_ids: List[str] = []
+    answers: List[str] = []
+    stem = path.stem
+    for i, qa in enumerate(iter_questions_stream(path), start=1):
+        # Ground truth must be present for solution building
+        correct = _get_fixed(qa, "correct_answer")
+        if correct is None:
+            raise ValueError(
+                f"Missing 'correct_answer' in {path.name} (q#{i}). "
+                "Solution building requires ground-truth labels."
+            )
+        # Fast path: already a clean one-letter label
+        if isinstance(correct, str) and correct in VALID_CHOICES:
+            label = correct
+        else:
+            label = str(correct).strip().upper()
+        if label not in VALID_CHOICES:
+            raise ValueError(
+                f"Invalid correct_answer='{correct}' in {path.name} (q#{i}). "
+                f"Expected one of {sorted(VALID_CHOICES)}."
+            )
+        row_ids.append(make_row_id(stem, i))
+        answers.append(label)
+    return row_ids, answers
+
+def extract_rows_from_dir(data_dir: Path, usage_value: str) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Walk a directory of JSON files and extract rows as parallel columns:
       - row_id
       - answer (ground truth)
       - Usage (Public/Private)
+    Files are parsed in parallel across processes.
     """
-    rows: List[Dict] = []
-    for path in sorted(data_dir.glob("*.json")):
-        j = load_json_fix_keys(path)
-        stem = path.stem
-        for i, (_, qa) in enumerate(iter_qas_from_json(j), start=1):
-            # Ground truth must be present for solution building
-            correct = qa.get("correct_answer", None)
-            if correct is None:
-                raise ValueError(
-                    f"Missing 'correct_answer' in {path.name} (q#{i}). "
-                    "Solution building requires ground-truth labels."
-                )
-            label = str(correct).strip().upper()
-            if label not in VALID_CHOICES:
-                raise ValueError(
-                    f"Invalid correct_answer='{correct}' in {path.name} (q#{i}). "
-                    f"Expected one of {sorted(VALID_CHOICES)}."
-                )
-            row = {
-                "row_id": make_row_id(stem, i),
-                "answer": label,
-                "Usage": usage_value,
-            }
-            rows.append(row)
-    return rows
+    # No pre-sort needed: main() sorts the final rows by (Usage, row_id)
+    with os.scandir(data_dir) as it:
+        paths = [Path(e.path) for e in it if e.is_file() and e.name.endswith(".json")]
+    row_ids: List[str] = []
+    answers: List[str] = []
+    if not paths:
+        return row_ids, answers, []
+    # Don't fork more workers than there are chunks to hand out
+    n_chunks = -(-len(paths) // PARSE_CHUNKSIZE)
+    with ProcessPoolExecutor(max_workers=min(n_chunks, os.cpu_count() or 1)) as ex:
+        for file_ids, file_answers in ex.map(_rows_from_file, paths, chunksize=PARSE_CHUNKSIZE):
+            row_ids += file_ids
+            answers += file_answers
+    return row_ids, answers, [usage_value] * len(row_ids)
 
 def main(
     public_dir: Path,
@@ -86,44 +126,54 @@ def main(
         raise FileNotFoundError(f"Public dir not found: {public_dir}")
 
     # Build rows for Public
-    public_rows = extract_rows_from_dir(public_dir, usage_value="Public")
+    row_ids, answers, usages = extract_rows_from_dir(public_dir, usage_value="Public")
 
     # Optionally add Private
-    private_rows: List[Dict] = []
     if private_dir:
         if not private_dir.exists():
             raise FileNotFoundError(f"Private dir not found: {private_dir}")
-        private_rows = extract_rows_from_dir(private_dir, usage_value="Private")
+        private_ids, private_answers, private_usages = extract_rows_from_dir(private_dir, usage_value="Private")
+        row_ids += private_ids
+        answers += private_answers
+        usages += private_usages
 
-    rows = public_rows + private_rows
-    if not rows:
+    if not row_ids:
         raise RuntimeError("No rows extracted. Are the folders empty?")
 
-    df_solution = pd.DataFrame(rows)
-
-    # Validate unique IDs
-    dup = df_solution["row_id"].duplicated(keep=False)
-    if dup.any():
-        dups = df_solution.loc[dup, "row_id"].value_counts()
+    # Validate unique IDs in a single hash pass
+    seen = set()
+    dups: List[str] = []
+    for row_id in row_ids:
+        if row_id in seen:
+            dups.append(row_id)
+        else:
+            seen.add(row_id)
+    if dups:
         raise ValueError(
             "Duplicate row_id detected in solution file. First few:\n"
-            + dups.head(10).to_string()
+            + "\n".join(sorted(dups)[:10])
         )
 
     # Optional: sort for determinism
-    df_solution = df_solution.sort_values(["Usage", "row_id"]).reset_index(drop=True)
+    rows = sorted(zip(row_ids, answers, usages), key=itemgetter(2, 0))
 
     # Save solution.csv
     out_solution.parent.mkdir(parents=True, exist_ok=True)
-    df_solution.to_csv(out_solution, index=False, encoding="utf-8")
-    print(f"✔ Wrote solution file: {out_solution}  (rows={len(df_solution)})")
-    print(df_solution["Usage"].value_counts())
+    with out_solution.open("w", buffering=CSV_BUFFER_SIZE, newline="", encoding="utf-8") as f:
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow(["row_id", "answer", "Usage"])
+        w.writerows(rows)
+    print(f"✔ Wrote solution file: {out_solution}  (rows={len(rows)})")
+    for usage, n in Counter(usages).most_common():
+        print(f"  {usage}: {n}")
 
     # Build sample_submission.csv: same IDs, blank/placeholder answers
-    df_sample = df_solution[["row_id"]].copy()
-    df_sample["answer"] = "A"  # harmless default; competitors will overwrite
-    df_sample.to_csv(out_sample_sub, index=False, encoding="utf-8")
-    print(f"✔ Wrote sample submission: {out_sample_sub}  (rows={len(df_sample)})")
+    with out_sample_sub.open("w", buffering=CSV_BUFFER_SIZE, newline="", encoding="utf-8") as f:
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow(["row_id", "answer"])
+        # "A" is a harmless default; competitors will overwrite
+        w.writerows((row_id, "A") for row_id, _, _ in rows)
+    print(f"✔ Wrote sample submission: {out_sample_sub}  (rows={len(rows)})")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
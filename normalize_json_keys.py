@@ -1,9 +1,25 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
 import json
-import re
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
 from pathlib import Path
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Tuple, Union
+
+import orjson
+
+# Pretty, stable output shared by every write; orjson emits UTF-8 bytes directly
+DUMP_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
+# Max files in flight at once (bounds open fds and buffered bytes); this is the
+# size of the thread pool that runs process_file
+MAX_CONCURRENT_FILES = 64
+
+def _fix_key(k: Any) -> str:
+    """Strip whitespace and any trailing colons from a key ('content:' -> 'content')."""
+    return str(k).strip().rstrip(":").rstrip()
 
 def fix_top_level_keys(d: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -11,8 +27,7 @@ def fix_top_level_keys(d: Dict[str, Any]) -> Dict[str, Any]:
     """
     fixed = {}
     for k, v in d.items():
-        k2 = re.sub(r":+$", "", str(k)).strip()
-        fixed[k2] = v
+        fixed[_fix_key(k)] = v
     return fixed
 
 def strip_from_questions(obj: Dict[str, Any]) -> Tuple[int, int]:
@@ -27,27 +42,47 @@ def strip_from_questions(obj: Dict[str, Any]) -> Tuple[int, int]:
     if not isinstance(questions, list):
         return removed_correct, removed_expl
 
-    for q in questions:
+    for i, q in enumerate(questions):
         if not isinstance(q, dict):
             continue
-        # Normalize nested keys that might have trailing colons
-        keys_map = {k: re.sub(r":+$", "", str(k)).strip() for k in list(q.keys())}
-        # If a normalized key conflicts, prefer normalized
-        for old_k, new_k in keys_map.items():
-            if new_k != old_k:
-                q[new_k] = q.pop(old_k)
+        # Normalize nested keys that might have trailing colons in a single rebuild
+        q = {_fix_key(k): v for k, v in q.items()}
 
         if "correct_answer" in q:
-            q.pop("correct_answer", None)
+            del q["correct_answer"]
             removed_correct += 1
         if "explanation" in q:
-            q.pop("explanation", None)
+            del q["explanation"]
             removed_expl += 1
+        questions[i] = q
 
     return removed_correct, removed_expl
 
-def process_file(src_path: Path, dst_path: Path) -> Tuple[int, int]:
-    data = json.loads(src_path.read_text(encoding="utf-8"))
+def _has_float(obj: Any) -> bool:
+    """True if any value in the parsed document is a float."""
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        t = type(o)
+        if t is dict:
+            stack.extend(o.values())
+        elif t is list:
+            stack.extend(o)
+        elif t is float:
+            return True
+    return False
+
+def clean_bytes(raw: bytes) -> Tuple[bytes, int, int]:
+    """
+    Normalize keys and strip answer fields from one raw JSON document.
+    Returns (cleaned_bytes, removed_correct, removed_expl).
+    """
+    data = orjson.loads(raw)
+    # orjson rewrites float text (1e-05 -> 0.00001) and reads integers wider
+    # than 64 bits as floats; fall back to stdlib json so those round-trip exactly
+    use_orjson = not _has_float(data)
+    if not use_orjson:
+        data = json.loads(raw)
 
     # Normalize top-level keys first
     data = fix_top_level_keys(data)
@@ -55,11 +90,47 @@ def process_file(src_path: Path, dst_path: Path) -> Tuple[int, int]:
     # Strip fields from questions
     rc, rexp = strip_from_questions(data)
 
-    # Save with pretty, stable formatting
+    # Pretty, stable formatting
+    if use_orjson:
+        out = orjson.dumps(data, option=DUMP_OPTIONS)
+    else:
+        out = (json.dumps(data, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+    return out, rc, rexp
+
+def process_file(src_path: Path, dst_path: Path) -> Tuple[int, int]:
+    out, rc, rexp = clean_bytes(src_path.read_bytes())
     dst_path.parent.mkdir(parents=True, exist_ok=True)
-    dst_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    dst_path.write_bytes(out)
     return rc, rexp
 
+async def process_file_async(src_path: Path, dst_path: Path, pool: ThreadPoolExecutor) -> Tuple[int, int]:
+    """
+    Async wrapper around process_file: the blocking read/clean/write runs on
+    `pool` so many files' I/O overlaps on slow or network filesystems.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, process_file, src_path, dst_path)
+
+async def process_files(pairs: List[Tuple[Path, Path]]) -> List[Union[Tuple[int, int], Exception]]:
+    """
+    Process (src, dst) pairs concurrently, logging each file as it completes.
+    Results come back in input order; a failed file yields its exception
+    instead of aborting the rest.
+    """
+    async def run_one(src_path: Path, dst_path: Path) -> Tuple[int, int]:
+        try:
+            rc, rexp = await process_file_async(src_path, dst_path, pool)
+        except Exception as e:
+            print(f"[FAIL] {src_path.name}: {type(e).__name__}: {e}")
+            raise
+        print(f"[OK] {src_path.name} -> {dst_path}  (-correct_answer:{rc}, -explanation:{rexp})")
+        return rc, rexp
+
+    # A local pool (rather than the loop's default executor) caps concurrency
+    # at MAX_CONCURRENT_FILES without touching loop-wide state
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FILES) as pool:
+        return await asyncio.gather(*(run_one(src, dst) for src, dst in pairs), return_exceptions=True)
+
 def main():
     ap = argparse.ArgumentParser(
         description="Strip 'correct_answer' and 'explanation' from JSONs in a public/ folder."
@@ -69,39 +140,53 @@ def main():
                     help="Output directory for cleaned files. If omitted and --inplace is set, files are overwritten.")
     ap.add_argument("--inplace", action="store_true",
                     help="Edit files in place (requires no out_dir).")
-    ap.add_argument("--glob", default="*.json", help="Glob pattern for JSON files (default: *.json)")
+    ap.add_argument("--glob", default="*.json", help="Filename pattern for JSON files (default: *.json)")
     args = ap.parse_args()
 
     if args.inplace and args.out_dir is not None:
         ap.error("Use either --inplace OR --out_dir, not both.")
     if not args.public_dir.exists():
         ap.error(f"public_dir not found: {args.public_dir}")
+    if "/" in args.glob or os.sep in args.glob:
+        ap.error(f"--glob matches file names inside public_dir only; got a path pattern: {args.glob}")
 
     total_files = 0
     total_removed_correct = 0
     total_removed_expl = 0
 
-    for src_path in sorted(args.public_dir.glob(args.glob)):
-        if not src_path.is_file():
-            continue
-        total_files += 1
+    pairs = []
+    with os.scandir(args.public_dir) as it:
+        src_paths = [Path(e.path) for e in it if e.is_file() and fnmatch(e.name, args.glob)]
+    for src_path in src_paths:
         dst_path = src_path if args.inplace else (
             (args.out_dir / src_path.name) if args.out_dir else None
         )
         if dst_path is None:
             # Default to a 'public_clean/' sibling if neither flag provided
             dst_path = args.public_dir.parent / "public_clean" / src_path.name
-
-        rc, rexp = process_file(src_path, dst_path)
+        pairs.append((src_path, dst_path))
+
+    # Work is dominated by file I/O, so overlap it with asyncio instead of processes
+    results = asyncio.run(process_files(pairs))
+    failed_files = []
+    for (src_path, _), result in zip(pairs, results):
+        if isinstance(result, Exception):
+            failed_files.append(src_path.name)
+            continue
+        rc, rexp = result
+        total_files += 1
         total_removed_correct += rc
         total_removed_expl += rexp
-        print(f"[OK] {src_path.name} -> {dst_path}  (-correct_answer:{rc}, -explanation:{rexp})")
 
     print("\nSummary")
     print("-------")
     print(f"Files processed       : {total_files}")
+    print(f"Files failed          : {len(failed_files)}")
     print(f"correct_answer removed: {total_removed_correct}")
     print(f"explanation removed   : {total_removed_expl}")
+    if failed_files:
+        print("Failed: " + ", ".join(sorted(failed_files)))
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,7 @@
 import os
 import shutil
 import random
+from concurrent.futures import ThreadPoolExecutor
 
 # === CONFIG ===
 src_folder = "/home/quannh/Downloads/Tempo_Run/train"   # Path to your dataset
@@ -10,33 +11,69 @@ split_counts = {
     "public": 200,
     "private": 300
 }
+# Hardlink instead of copying (O(1), no extra disk). Opt-in: linked files share
+# data with src_folder, so any in-place edit of a split file (e.g.
+# normalize_json_keys.py --inplace) would also rewrite the source dataset.
+use_hardlinks = False
 # ==============
 
+def _link_or_copy(src, dst):
+    """
+    Copy src to dst with a kernel-side copy_file_range (reflink on CoW
+    filesystems), falling back to shutil.copy2. Hardlinks first when
+    use_hardlinks is set.
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)  # never write through a previous run's hardlink into src
+    if use_hardlinks:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            remaining = os.fstat(s.fileno()).st_size
+            while remaining > 0:
+                n = os.copy_file_range(s.fileno(), d.fileno(), remaining)
+                if n == 0:
+                    # Some filesystems report 0 instead of failing; use copy2
+                    raise OSError("copy_file_range copied no data")
+                remaining -= n
+        shutil.copystat(src, dst)
+    except (OSError, AttributeError):  # AttributeError: no copy_file_range on this platform
+        shutil.copy2(src, dst)
+
 # Create output directories
 for split in split_counts.keys():
     os.makedirs(os.path.join(output_folder, split), exist_ok=True)
 
 # List all files
-files = [f for f in os.listdir(src_folder) if os.path.isfile(os.path.join(src_folder, f))]
-random.shuffle(files)  # Shuffle for randomness
+with os.scandir(src_folder) as it:
+    files = [e.name for e in it if e.is_file()]
 
 # Check if enough files exist
 total_needed = sum(split_counts.values())
 if len(files) < total_needed:
     raise ValueError(f"Not enough files! Found {len(files)} but need {total_needed}.")
 
-# Assign files
+# Assign files: draw only what the splits need instead of shuffling everything
+picked = random.sample(files, total_needed)
 start = 0
 splits = {}
 for split, count in split_counts.items():
     end = start + count
-    splits[split] = files[start:end]
+    splits[split] = picked[start:end]
     start = end
 
-# Copy files
-for split, split_files in splits.items():
-    for f in split_files:
-        shutil.copy2(os.path.join(src_folder, f), os.path.join(output_folder, split, f))
+# Link/copy files (I/O-bound, so threads overlap the syscalls)
+tasks = [
+    (os.path.join(src_folder, f), os.path.join(output_folder, split, f))
+    for split, split_files in splits.items()
+    for f in split_files
+]
+with ThreadPoolExecutor(max_workers=16) as ex:
+    list(ex.map(lambda t: _link_or_copy(*t), tasks))
 
 print(f"✅ Done! Split {len(files)} files into:")
 for split, split_files in splits.items():